@@ -18,189 +18,83 @@ Provides a command-line interface to use the principalmapper library
 #      along with Principal Mapper.  If not, see <https://www.gnu.org/licenses/>.
 
 import argparse
+import functools
 import os
 import os.path
 from pathlib import Path
 import sys
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 
-import botocore.session
+import principalmapper
 
-from principalmapper.analysis.find_risks import gen_findings_and_print
-import principalmapper.graphing.graph_actions
-from principalmapper.graphing.edge_identification import checker_map
-from principalmapper.querying import query_actions
-from principalmapper.querying import repl
-from principalmapper.util import botocore_tools
-from principalmapper.util.debug_print import dprint
-from principalmapper.util.storage import get_storage_root
-from principalmapper.visualizing import graph_writer
+if TYPE_CHECKING:
+    import botocore.session
 
+# Note: imports from principalmapper's submodules and botocore are deferred to the functions that use them, so that
+# invoking `pmapper --help` does not pay the cost of loading botocore/pydot and the rest of the library.
 
-def main() -> int:
-    """Point of entry for command-line"""
-    argument_parser = argparse.ArgumentParser(prog='pmapper')
-    argument_parser.add_argument(
-        '--profile',
-        help='AWS CLI (botocore) profile to use to call the AWS API'
-    )  # Note: do NOT set the default, we want to know if the profile arg was specified or not
-    argument_parser.add_argument(
-        '--debug',
-        action='store_true',
-        help='Produces debug-level output'
-    )
-    argument_parser.add_argument(
-        '--account',
-        help='When running offline operations, this parameter determines which account to act against.'
-    )
 
-    # Create subparser for various subcommands
-    subparser = argument_parser.add_subparsers(
-        title='subcommand',
-        description='The subcommand to use among this suite of tools',
-        dest='picked_cmd',
-        help='Select a subcommand to execute'
-    )
+# Mirrors what argparse prints for `pmapper --help` at the terminal width in _MAIN_HELP_COLUMNS, the subcommand list
+# is appended by _print_main_help(). tests/test_command_line.py checks it against the output of argparse.
+_MAIN_HELP = '''usage: pmapper [-h] [--version] [--profile PROFILE] [--debug]
+               [--account ACCOUNT]
+               {{{choices}}} ...
 
-    # Graph subcommand
-    graphparser = subparser.add_parser(
-        'graph',
-        description='Obtains information about a specific AWS account\'s use of IAM for analysis.',
-        help='Pulls information for an AWS account\'s use of IAM.'
-    )
-    command_group = graphparser.add_mutually_exclusive_group(required=True)
-    command_group.add_argument(
-        '--create',
-        action='store_true',
-        help='Creates a completely new graph for an AWS account, wiping away any old data.'
-    )
-    command_group.add_argument(
-        '--display',
-        action='store_true',
-        help='Displays information about a currently-stored graph based on the AWS credentials used.'
-    )
-    command_group.add_argument(
-        '--list',
-        action='store_true',
-        help='List the Account IDs of graphs stored on this computer.'
-    )
-    command_group.add_argument(
-        '--update-edges',
-        action='store_true',
-        help='Updates the edges of an AWS account. Does not gather information about IAM users or roles.'
-    )
+{options_heading}:
+  -h, --help            show this help message and exit
+  --version             show program's version number and exit
+  --profile PROFILE     AWS CLI (botocore) profile to use to call the AWS API
+  --debug               Produces debug-level output
+  --account ACCOUNT     When running offline operations, this parameter
+                        determines which account to act against.
 
-    # Query subcommand
-    queryparser = subparser.add_parser(
-        'query',
-        description='Displays information corresponding to a roughly human-readable query.',
-        help='Displays information corresponding to a query'
-    )
-    queryparser.add_argument(
-        '-s',
-        '--skip-admin',
-        action='store_true',
-        help='Ignores "admin" level principals when querying about multiple principals in an account'
-    )
-    queryparser.add_argument(
-        'query',
-        help='The query to execute.'
-    )
+subcommand:
+  The subcommand to use among this suite of tools
 
-    # New Query subcommand
-    argqueryparser = subparser.add_parser(
-        'argquery',
-        description='Displays information corresponding to a arg-specified query.',
-        help='Displays information corresponding to a query'
-    )
-    argqueryparser.add_argument(
-        '-s',
-        '--skip-admin',
-        action='store_true',
-        help='Ignores administrative principals when querying about multiple principals in an account'
-    )
-    argqueryparser.add_argument(
-        '--principal',
-        default='*',
-        help='A string matching one or more IAM users or roles in the account, or use * (the default) to include all'
-    )
-    argqueryparser.add_argument(
-        '--action',
-        help='An AWS action to test for, allows * wildcards'
-    )
-    argqueryparser.add_argument(
-        '--resource',
-        default='*',
-        help='An AWS resource (denoted by ARN) to test for'
-    )
-    argqueryparser.add_argument(
-        '--condition',
-        action='append',
-        help='A set of key-value pairs to test specific conditions'
-    )
-    argqueryparser.add_argument(
-        '--preset',
-        help='A preset query to run'
-    )
-
-    # REPL subcommand
-    replparser = subparser.add_parser(
-        'repl',
-        description='Runs a read-evaluate-print-loop of queries, avoiding the need to read from disk for each query',
-        help='Runs a REPL for querying'
-    )
+  {{{choices}}}
+                        Select a subcommand to execute'''
+_MAIN_HELP_COLUMNS = 80
 
-    # Visualization subcommand
-    visualizationparser = subparser.add_parser(
-        'visualize',
-        description='Generates an image file to display information about an AWS account',
-        help='Generates an image representing the AWS account'
-    )
-    visualizationparser.add_argument(
-        '--filetype',
-        default='svg',
-        choices=['svg', 'png', 'dot'],
-        help='The (lowercase) filetype to output the image as.'
-    )
 
-    # Analysis subcommand
-    analysisparser = subparser.add_parser(
-        'analysis',
-        description='Analyzes and reports identified issues',
-        help='Analyzes and reports identified issues'
-    )
-    analysisparser.add_argument(
-        '--output-type',
-        default='text',
-        choices=['text', 'json'],
-        help='The type of output for identified issues.'
-    )
+def main() -> int:
+    """Point of entry for command-line"""
+    # Answer bare invocations, --help, and --version without parsing, and where possible without constructing any
+    # ArgumentParser
+    if len(sys.argv) == 1 or sys.argv[1] in ('-h', '--help'):
+        if _get_help_columns() == _MAIN_HELP_COLUMNS:
+            _print_main_help()
+        else:
+            _build_argument_parser(None, True).print_help()
+        return 0 if len(sys.argv) > 1 else 64
+    if sys.argv[1] == '--version':
+        print('pmapper ' + principalmapper.__version__)
+        return 0
+
+    argument_parser = _build_argument_parser(_sniff_subcommand(sys.argv[1:]), '-h' in sys.argv or '--help' in sys.argv)
+    parsed_args = argument_parser.parse_args()
 
-    # TODO: Cross-Account subcommand(s)
+    if parsed_args.debug:  # skips importing dprint and formatting the Namespace otherwise
+        from principalmapper.util.debug_print import dprint
+        dprint(parsed_args.debug, 'Debugging mode enabled.')
+        dprint(parsed_args.debug, 'Parsed Args: ' + str(parsed_args))
 
-    parsed_args = argument_parser.parse_args()
+    if parsed_args.account is not None and parsed_args.picked_cmd in _GRAPH_LOADING_SUBCOMMANDS:
+        from principalmapper.util.storage import prefetch_graph_data
+        prefetch_graph_data(parsed_args.account)
 
-    dprint(parsed_args.debug, 'Debugging mode enabled.')
-    dprint(parsed_args.debug, 'Parsed Args: ' + str(parsed_args))
-
-    if parsed_args.picked_cmd == 'graph':
-        return handle_graph(parsed_args)
-    elif parsed_args.picked_cmd == 'query':
-        return handle_query(parsed_args)
-    elif parsed_args.picked_cmd == 'argquery':
-        return handle_argquery(parsed_args)
-    elif parsed_args.picked_cmd == 'repl':
-        return handle_repl(parsed_args)
-    elif parsed_args.picked_cmd == 'visualize':
-        return handle_visualization(parsed_args)
-    elif parsed_args.picked_cmd == 'analysis':
-        return handle_analysis(parsed_args)
+    handler = _SUBCOMMAND_HANDLERS.get(parsed_args.picked_cmd)
+    if handler is not None:
+        return handler(parsed_args)
 
     return 64  # /usr/include/sysexits.h
 
 
 def handle_graph(parsed_args) -> int:
     """Processes the arguments for the graph subcommand and executes related tasks"""
+    import principalmapper.graphing.graph_actions
+    from principalmapper.graphing.edge_identification import checker_map
+    from principalmapper.util.storage import get_storage_root
+
     session = _grab_session(parsed_args)
 
     if parsed_args.create:  # --create
@@ -240,6 +134,9 @@ def handle_graph(parsed_args) -> int:
 
 def handle_query(parsed_args) -> int:
     """Processes the arguments for the query subcommand and executes related tasks"""
+    import principalmapper.graphing.graph_actions
+    from principalmapper.querying import query_actions
+
     session = _grab_session(parsed_args)
     graph = principalmapper.graphing.graph_actions.get_existing_graph(session, parsed_args.account, parsed_args.debug)
 
@@ -250,6 +147,9 @@ def handle_query(parsed_args) -> int:
 
 def handle_argquery(parsed_args) -> int:
     """Processes the arguments for the argquery subcommand and executes related tasks"""
+    import principalmapper.graphing.graph_actions
+    from principalmapper.querying import query_actions
+
     session = _grab_session(parsed_args)
     graph = principalmapper.graphing.graph_actions.get_existing_graph(session, parsed_args.account, parsed_args.debug)
 
@@ -258,13 +158,11 @@ def handle_argquery(parsed_args) -> int:
     if parsed_args.condition is not None:
         for arg in parsed_args.condition:
             # split on equals-sign (=), assume first instance separates the key and value
-            components = arg.split('=')
-            if len(components) < 2:
+            key, sep, value = arg.partition('=')
+            if not sep:
                 print('Format for condition args not matched: <key>=<value>')
                 return 64
-            key = components[0]
-            value = '='.join(components[1:])
-            conditions.update({key: value})
+            conditions[key] = value
 
     query_actions.argquery(graph, parsed_args.principal, parsed_args.action, parsed_args.resource, conditions,
                            parsed_args.preset, parsed_args.skip_admin, sys.stdout, parsed_args.debug)
@@ -274,30 +172,62 @@ def handle_argquery(parsed_args) -> int:
 
 def handle_repl(parsed_args):
     """Processes the arguments for the query REPL and initiates"""
+    import concurrent.futures
+    import threading
+    import principalmapper.graphing.graph_actions
+    from principalmapper.querying import repl
+
     session = _grab_session(parsed_args)
-    graph = principalmapper.graphing.graph_actions.get_existing_graph(session, parsed_args.account, parsed_args.debug)
+
+    if parsed_args.debug:
+        # load before printing the banner, so the debug output of loading doesn't land in the middle of it
+        graph = principalmapper.graphing.graph_actions.get_existing_graph(session, parsed_args.account, True)
+        repl.PMapperREPL.print_banner()
+    else:
+        # load the Graph in the background while the banner prints. This uses a daemon thread rather than an executor,
+        # whose threads are always joined, so Ctrl+C during a slow load exits without waiting for the load to finish.
+        graph_future = concurrent.futures.Future()
+
+        def _load_graph():
+            try:
+                graph_future.set_result(principalmapper.graphing.graph_actions.get_existing_graph(
+                    session, parsed_args.account, False
+                ))
+            except Exception as ex:
+                graph_future.set_exception(ex)
+
+        threading.Thread(target=_load_graph, daemon=True).start()
+        repl.PMapperREPL.print_banner()
+        graph = graph_future.result()
 
     repl_obj = repl.PMapperREPL(graph)
-    repl_obj.begin_repl()
+    repl_obj.begin_repl(show_banner=False)
 
     return 0
 
 
 def handle_visualization(parsed_args):
     """Processes the arguments for the visualization subcommand and executes related tasks"""
+    import principalmapper.graphing.graph_actions
+    from principalmapper.visualizing import graph_writer
+
     # get Graph to draw/write
     session = _grab_session(parsed_args)
     graph = principalmapper.graphing.graph_actions.get_existing_graph(session, parsed_args.account, parsed_args.debug)
 
     # create file
-    filepath = './{}.{}'.format(graph.metadata['account_id'], parsed_args.filetype)
-    graph_writer.handle_request(graph, filepath, parsed_args.filetype)
+    filetype = parsed_args.filetype
+    filepath = os.path.join(os.curdir, graph.metadata['account_id'] + '.' + filetype)
+    graph_writer.handle_request(graph, filepath, filetype)
 
     return 0
 
 
 def handle_analysis(parsed_args):
     """Processes the arguments for the analysis subcommand and executes related tasks"""
+    import principalmapper.graphing.graph_actions
+    from principalmapper.analysis.find_risks import gen_findings_and_print
+
     # get Graph object
     session = _grab_session(parsed_args)
     graph = principalmapper.graphing.graph_actions.get_existing_graph(session, parsed_args.account, parsed_args.debug)
@@ -308,12 +238,253 @@ def handle_analysis(parsed_args):
     return 0
 
 
-def _grab_session(parsed_args) -> Optional[botocore.session.Session]:
-    if parsed_args.account is None:
-        return botocore_tools.get_session(parsed_args.profile)
+def _grab_session(parsed_args) -> Optional['botocore.session.Session']:
+    return _session_for(parsed_args.account, parsed_args.profile)
+
+
+@functools.lru_cache(maxsize=None)
+def _session_for(account: Optional[str], profile: Optional[str]) -> Optional['botocore.session.Session']:
+    """Returns a botocore session for the given profile when no account is given, reusing sessions between calls"""
+    if account is None:
+        from principalmapper.util import botocore_tools
+        return botocore_tools.get_session(profile)
     else:
         return None
 
 
+def _build_argument_parser(picked: Optional[str], full_help: bool) -> argparse.ArgumentParser:
+    """Constructs the ArgumentParser for pmapper. When a subcommand is picked, only its subparser is added (with its
+    arguments), otherwise every subcommand is only listed by name for --help. The description and help of the picked
+    subcommand are only ever printed for --help, so they are skipped unless full_help is set.
+    """
+    argument_parser = argparse.ArgumentParser(prog='pmapper')
+    argument_parser.add_argument(
+        '--version',
+        action='version',
+        version='%(prog)s ' + principalmapper.__version__
+    )
+    argument_parser.add_argument(
+        '--profile',
+        help='AWS CLI (botocore) profile to use to call the AWS API'
+    )  # Note: do NOT set the default, we want to know if the profile arg was specified or not
+    argument_parser.add_argument(
+        '--debug',
+        action='store_true',
+        help='Produces debug-level output'
+    )
+    argument_parser.add_argument(
+        '--account',
+        help='When running offline operations, this parameter determines which account to act against.'
+    )
+
+    # Create subparser for various subcommands
+    subparser = argument_parser.add_subparsers(
+        title='subcommand',
+        description='The subcommand to use among this suite of tools',
+        dest='picked_cmd',
+        help='Select a subcommand to execute'
+    )
+    for name, description, help_text in _SUBCOMMANDS:
+        if picked is None:
+            subparser.add_parser(name, description=description, help=help_text)
+        elif name == picked:
+            if full_help:
+                cmd_parser = subparser.add_parser(name, description=description, help=help_text)
+            else:
+                cmd_parser = subparser.add_parser(name)
+            if name in _SUBCOMMAND_ARGUMENTS:
+                _SUBCOMMAND_ARGUMENTS[name](cmd_parser)
+
+    # TODO: Cross-Account subcommand(s)
+
+    return argument_parser
+
+
+def _get_help_columns() -> int:
+    """Returns the terminal width that argparse lays out help pages for"""
+    if sys.version_info >= (3, 8):
+        import shutil
+        return shutil.get_terminal_size().columns
+    try:
+        return int(os.environ['COLUMNS'])
+    except (KeyError, ValueError):
+        return 80
+
+
+def _print_main_help() -> None:
+    """Prints the top-level help page of pmapper, laid out for a terminal width of _MAIN_HELP_COLUMNS"""
+    print(_MAIN_HELP.format(
+        choices=','.join(name for name, _, _ in _SUBCOMMANDS),
+        options_heading='options' if sys.version_info >= (3, 10) else 'optional arguments'
+    ))
+    for name, _, help_text in _SUBCOMMANDS:
+        print('    {:<20}{}'.format(name, help_text))
+
+
+def _sniff_subcommand(args: List[str]) -> Optional[str]:
+    """Returns the subcommand picked in the given command-line args, or None if there isn't one. Skips over the values
+    of the top-level --profile and --account args (including abbreviations, which argparse accepts).
+    """
+    skip_next = False
+    positional_only = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+        elif positional_only or not arg.startswith('-'):
+            return arg if arg in _SUBCOMMAND_NAMES else None
+        elif arg == '--':  # argparse treats everything after -- as positional
+            positional_only = True
+        elif len(arg) > 2 and '=' not in arg and ('--profile'.startswith(arg) or '--account'.startswith(arg)):
+            skip_next = True
+    return None
+
+
+def _provide_graph_arguments(graphparser: argparse.ArgumentParser) -> None:
+    """Adds the arguments for the graph subcommand"""
+    command_group = graphparser.add_mutually_exclusive_group(required=True)
+    command_group.add_argument(
+        '--create',
+        action='store_true',
+        help='Creates a completely new graph for an AWS account, wiping away any old data.'
+    )
+    command_group.add_argument(
+        '--display',
+        action='store_true',
+        help='Displays information about a currently-stored graph based on the AWS credentials used.'
+    )
+    command_group.add_argument(
+        '--list',
+        action='store_true',
+        help='List the Account IDs of graphs stored on this computer.'
+    )
+    command_group.add_argument(
+        '--update-edges',
+        action='store_true',
+        help='Updates the edges of an AWS account. Does not gather information about IAM users or roles.'
+    )
+
+
+def _provide_query_arguments(queryparser: argparse.ArgumentParser) -> None:
+    """Adds the arguments for the query subcommand"""
+    queryparser.add_argument(
+        '-s',
+        '--skip-admin',
+        action='store_true',
+        help='Ignores "admin" level principals when querying about multiple principals in an account'
+    )
+    queryparser.add_argument(
+        'query',
+        help='The query to execute.'
+    )
+
+
+def _provide_argquery_arguments(argqueryparser: argparse.ArgumentParser) -> None:
+    """Adds the arguments for the argquery subcommand"""
+    argqueryparser.add_argument(
+        '-s',
+        '--skip-admin',
+        action='store_true',
+        help='Ignores administrative principals when querying about multiple principals in an account'
+    )
+    argqueryparser.add_argument(
+        '--principal',
+        default='*',
+        help='A string matching one or more IAM users or roles in the account, or use * (the default) to include all'
+    )
+    argqueryparser.add_argument(
+        '--action',
+        help='An AWS action to test for, allows * wildcards'
+    )
+    argqueryparser.add_argument(
+        '--resource',
+        default='*',
+        help='An AWS resource (denoted by ARN) to test for'
+    )
+    argqueryparser.add_argument(
+        '--condition',
+        action='append',
+        help='A set of key-value pairs to test specific conditions'
+    )
+    argqueryparser.add_argument(
+        '--preset',
+        help='A preset query to run'
+    )
+
+
+def _provide_visualization_arguments(visualizationparser: argparse.ArgumentParser) -> None:
+    """Adds the arguments for the visualize subcommand"""
+    visualizationparser.add_argument(
+        '--filetype',
+        default='svg',
+        choices=['svg', 'png', 'dot'],
+        help='The (lowercase) filetype to output the image as.'
+    )
+
+
+def _provide_analysis_arguments(analysisparser: argparse.ArgumentParser) -> None:
+    """Adds the arguments for the analysis subcommand"""
+    analysisparser.add_argument(
+        '--output-type',
+        default='text',
+        choices=['text', 'json'],
+        help='The type of output for identified issues.'
+    )
+
+
+# (name, description, help) of each subcommand, in the order they are listed by `pmapper --help`
+_SUBCOMMANDS = (
+    (
+        'graph',
+        'Obtains information about a specific AWS account\'s use of IAM for analysis.',
+        'Pulls information for an AWS account\'s use of IAM.'
+    ),
+    (
+        'query',
+        'Displays information corresponding to a roughly human-readable query.',
+        'Displays information corresponding to a query'
+    ),
+    (
+        'argquery',
+        'Displays information corresponding to a arg-specified query.',
+        'Displays information corresponding to a query'
+    ),
+    (
+        'repl',
+        'Runs a read-evaluate-print-loop of queries, avoiding the need to read from disk for each query',
+        'Runs a REPL for querying'
+    ),
+    (
+        'visualize',
+        'Generates an image file to display information about an AWS account',
+        'Generates an image representing the AWS account'
+    ),
+    (
+        'analysis',
+        'Analyzes and reports identified issues',
+        'Analyzes and reports identified issues'
+    )
+)
+_SUBCOMMAND_NAMES = frozenset(name for name, _, _ in _SUBCOMMANDS)
+_GRAPH_LOADING_SUBCOMMANDS = frozenset(('query', 'argquery', 'repl', 'visualize', 'analysis'))
+
+# The repl subcommand takes no arguments
+_SUBCOMMAND_ARGUMENTS = {
+    'graph': _provide_graph_arguments,
+    'query': _provide_query_arguments,
+    'argquery': _provide_argquery_arguments,
+    'visualize': _provide_visualization_arguments,
+    'analysis': _provide_analysis_arguments
+}
+
+_SUBCOMMAND_HANDLERS = {
+    'graph': handle_graph,
+    'query': handle_query,
+    'argquery': handle_argquery,
+    'repl': handle_repl,
+    'visualize': handle_visualization,
+    'analysis': handle_analysis
+}
+
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -24,6 +24,11 @@ from typing import Optional
 import packaging
 import packaging.version
 
+try:
+    import orjson  # optional, parses the stored Graph data faster than the json module
+except ImportError:
+    orjson = None
+
 import principalmapper
 from principalmapper.common.edges import Edge
 from principalmapper.common.groups import Group
@@ -132,8 +137,7 @@ class Graph(object):
         policiesfilepath = os.path.join(graphdir, 'policies.json')
         groupsfilepath = os.path.join(graphdir, 'groups.json')
 
-        with open(metadatafilepath) as f:
-            metadata = json.load(f)
+        metadata = _load_json_file(metadatafilepath)
 
         current_pmapper_version = packaging.version.parse(principalmapper.__version__)
         loaded_graph_version = packaging.version.parse(metadata['pmapper_version'])
@@ -145,14 +149,12 @@ class Graph(object):
                                                                                 current_pmapper_version))
 
         policies = []
-        with open(policiesfilepath) as f:
-            policies_file_contents = json.load(f)
+        policies_file_contents = _load_json_file(policiesfilepath)
 
         for policy in policies_file_contents:
             policies.append(Policy(arn=policy['arn'], name=policy['name'], policy_doc=policy['policy_doc']))
 
-        with open(groupsfilepath) as f:
-            unresolved_groups = json.load(f)
+        unresolved_groups = _load_json_file(groupsfilepath)
         groups = []
         for group in unresolved_groups:
             # dig through string list of attached policies to match up with policy objects with matching ARNs
@@ -164,8 +166,7 @@ class Graph(object):
                         break
             groups.append(Group(arn=group['arn'], attached_policies=group_policies))
 
-        with open(nodesfilepath) as f:
-            unresolved_nodes = json.load(f)
+        unresolved_nodes = _load_json_file(nodesfilepath)
         nodes = []
         for node in unresolved_nodes:
             # dig through string list of groups and policies to match up with group and policy objects
@@ -185,8 +186,7 @@ class Graph(object):
                               instance_profile=node['instance_profile'], num_access_keys=node['access_keys'],
                               active_password=node['active_password'], is_admin=node['is_admin']))
 
-        with open(edgesfilepath) as f:
-            unresolved_edges = json.load(f)
+        unresolved_edges = _load_json_file(edgesfilepath)
         edges = []
         for edge in unresolved_edges:
             # dig through nodes to find matching ARNs
@@ -202,3 +202,12 @@ class Graph(object):
             edges.append(Edge(source=source, destination=destination, reason=edge['reason']))
 
         return Graph(nodes=nodes, edges=edges, policies=policies, groups=groups, metadata=metadata)
+
+
+def _load_json_file(filepath: str):
+    """Returns the parsed contents of a JSON file, using orjson if it is installed."""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath) as f:
+        return json.load(f)
@@ -17,12 +17,15 @@
 
 import os
 import os.path
+import pickle
 import sys
+import tempfile
 
 import botocore.session
 from principalmapper.common import Graph
 from principalmapper.graphing import gathering
 from principalmapper.util.debug_print import dprint
+from principalmapper.util.storage import get_graph_cache_header, get_graph_cache_path, open_graph_cache
 from principalmapper.util.storage import get_storage_root
 from typing import List, Optional
 
@@ -53,9 +56,53 @@ def print_graph_data(graph: Graph) -> None:
 def get_graph_from_disk(location: str) -> Graph:
     """Returns a Graph object constructed from data stored on-disk at any location. This basically wraps around the
     static method in principalmapper.common.graph named Graph.create_graph_from_local_disk(...).
+
+    A pickled copy of the Graph is kept in the per-user cache directory (see get_graph_cache_path). It is loaded
+    instead of the JSON documents when its header matches them (see get_graph_cache_header), otherwise it is rewritten.
     """
+    try:
+        cache_path = get_graph_cache_path(location)
+    except (OSError, ValueError):  # no usable cache directory, go without the cache
+        return Graph.create_graph_from_local_disk(location)
+
+    graph = _load_cached_graph(location, cache_path)
+    if graph is None:
+        try:
+            header = get_graph_cache_header(location)  # taken before loading, so changes made meanwhile show up
+        except OSError:
+            header = None  # create_graph_from_local_disk raises the appropriate error
+        graph = Graph.create_graph_from_local_disk(location)
+        if header is not None:
+            _store_cached_graph(graph, header, cache_path)
+    return graph
+
 
-    return Graph.create_graph_from_local_disk(location)
+def _load_cached_graph(location: str, cache_path: str) -> Optional[Graph]:
+    """Returns the Graph pickled at cache_path, or None if it is missing, stale, or of a different format."""
+    cache_file = open_graph_cache(location, cache_path)
+    if cache_file is None:
+        return None
+    try:
+        with cache_file:
+            return pickle.load(cache_file)
+    except Exception:  # corrupt: fall back to the JSON documents
+        return None
+
+
+def _store_cached_graph(graph: Graph, header: tuple, cache_path: str) -> None:
+    """Pickles the Graph to cache_path after the given header, replacing the file atomically. Failing to write the
+    cache is not an error.
+    """
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')  # created as 0600
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 def get_existing_graph(session: Optional[botocore.session.Session], account: Optional[str], debug=False) -> Graph:
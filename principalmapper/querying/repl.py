@@ -94,14 +94,12 @@ class PMapperREPL:
             help='A preset query to run'
         )
 
-    def begin_repl(self):
-        """The meat of our work: Read, Eval, Print, and Loop"""
-        print('##############################')
-        print('#                            #')
-        print('#   Principal Mapper REPL    #')
-        print('#                            #')
-        print('##############################')
-        print()
+    def begin_repl(self, show_banner: bool = True):
+        """The meat of our work: Read, Eval, Print, and Loop. Set show_banner to False if print_banner() was already
+        called, such as while the Graph was still loading.
+        """
+        if show_banner:
+            self.print_banner()
         while True:
             # Read
             try:
@@ -127,12 +125,10 @@ class PMapperREPL:
                     if parsed_args.condition is not None:
                         for arg in parsed_args.condition:
                             # split on equals-sign (=), assume first instance separates the key and value
-                            components = arg.split('=')
-                            if len(components) < 2:
+                            key, sep, value = arg.partition('=')
+                            if not sep:
                                 raise ValueError('Format for condition args not matched: <key>=<value>')
-                            key = components[0]
-                            value = '='.join(components[1:])
-                            conditions.update({key: value})
+                            conditions[key] = value
 
                     query_actions.argquery(self.graph, parsed_args.principal, parsed_args.action, parsed_args.resource,
                                            conditions, parsed_args.preset, parsed_args.skip_admin, sys.stdout,
@@ -154,6 +150,16 @@ class PMapperREPL:
 
             # Loop
 
+    @staticmethod
+    def print_banner():
+        """Prints the banner shown when the REPL starts."""
+        print('##############################')
+        print('#                            #')
+        print('#   Principal Mapper REPL    #')
+        print('#                            #')
+        print('##############################')
+        print()
+
     @staticmethod
     def _print_help():
         """Prints a helppage for using the REPL."""
@@ -15,9 +15,18 @@
 #      You should have received a copy of the GNU Affero General Public License
 #      along with Principal Mapper.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
 import os
 import os.path
+import pickle
 import sys
+import threading
+from typing import BinaryIO, List, Optional
+
+import principalmapper
+
+# Bump whenever the attributes of Graph, Node, Edge, Policy, or Group change, so pickles of the old layout are ignored
+_GRAPH_CACHE_FORMAT = 4
 
 
 def get_storage_root():
@@ -49,3 +58,131 @@ def get_storage_root():
     if not os.path.exists(result):
         os.makedirs(result, 0o700)
     return result
+
+
+def get_cache_root():
+    """Locates and returns a path to the per-user cache directory, depending on OS. If the path does not exist yet, it
+    is created. Unlike the storage root, nothing in here needs to be kept or shared: it only holds data derived from
+    the storage root to speed up loading it.
+    """
+    platform = sys.platform
+    result = None
+    if platform == 'win32' or platform == 'cygwin':
+        # Windows: file root at %LOCALAPPDATA%\principalmapper\cache\
+        appdatadir = os.getenv('LOCALAPPDATA')
+        if appdatadir is None:
+            raise ValueError('%LOCALAPPDATA% was unexpectedly not set')
+        result = os.path.join(appdatadir, 'principalmapper', 'cache')
+    elif platform == 'linux' or platform == 'freebsd' or platform.startswith('openbsd'):
+        # Linux/FreeBSD: follow XDG convention: $XDG_CACHE_HOME/principalmapper/
+        # if $XDG_CACHE_HOME isn't set, default to ~/.cache/principalmapper/
+        cachedir = os.getenv('XDG_CACHE_HOME')
+        if cachedir is None:
+            cachedir = os.path.join(os.path.expanduser('~'), '.cache')
+        result = os.path.join(cachedir, 'principalmapper')
+    elif platform == 'darwin':
+        # MacOS: follow MacOS convention: ~/Library/Caches/com.nccgroup.principalmapper/
+        cachedir = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+        result = os.path.join(cachedir, 'com.nccgroup.principalmapper')
+    os.makedirs(result, 0o700, exist_ok=True)  # may race with prefetch_graph_data's thread
+    return result
+
+
+def get_graph_cache_path(location: str) -> str:
+    """Returns the path of the pickled copy of the Graph stored at location, keyed by the absolute path of location."""
+    location_hash = hashlib.sha256(os.path.abspath(location).encode('utf-8')).hexdigest()
+    return os.path.join(get_cache_root(), location_hash + '.pkl')
+
+
+def get_graph_cache_header(location: str) -> tuple:
+    """Returns the header that an up-to-date pickled copy of the Graph stored at location starts with: the cache
+    format, the version of Principal Mapper, and the modification time and size of each JSON document. Copies that
+    keep mtimes (backups, cp -p, rsync -a, tar) still change the header unless the files are identical in both. Raises
+    OSError if a JSON document is missing.
+    """
+    file_stats = []
+    for filepath in _get_graph_json_paths(location):
+        file_stat = os.stat(filepath)
+        file_stats.append((file_stat.st_mtime_ns, file_stat.st_size))
+    return _GRAPH_CACHE_FORMAT, principalmapper.__version__, tuple(file_stats)
+
+
+def open_graph_cache(location: str, cache_path: str) -> Optional[BinaryIO]:
+    """Opens the pickled copy of the Graph stored at location and reads past its header. Returns None instead if the
+    pickle is missing, not owned by the current user, or its header doesn't match get_graph_cache_header(location).
+    The header is checked before unpickling any Graph data, which may not match the current classes.
+    """
+    try:
+        header = get_graph_cache_header(location)
+        cache_file = open(cache_path, 'rb')
+    except OSError:
+        return None
+    try:
+        if hasattr(os, 'getuid') and os.fstat(cache_file.fileno()).st_uid != os.getuid():
+            cache_file.close()
+            return None
+        if pickle.load(cache_file) == header:
+            return cache_file
+    except Exception:  # unreadable or corrupt
+        pass
+    cache_file.close()
+    return None
+
+
+def is_graph_cache_fresh(location: str, cache_path: str) -> bool:
+    """Returns True if the pickle at cache_path is an up-to-date copy of the Graph stored at location (see
+    open_graph_cache).
+    """
+    cache_file = open_graph_cache(location, cache_path)
+    if cache_file is None:
+        return False
+    cache_file.close()
+    return True
+
+
+def _get_graph_json_paths(location: str) -> List[str]:
+    """Returns the paths of the JSON documents of the Graph stored at location"""
+    graphdir = os.path.join(location, 'graph')
+    return [
+        os.path.join(location, 'metadata.json'),
+        os.path.join(graphdir, 'nodes.json'),
+        os.path.join(graphdir, 'edges.json'),
+        os.path.join(graphdir, 'policies.json'),
+        os.path.join(graphdir, 'groups.json')
+    ]
+
+
+def prefetch_graph_data(account: str) -> None:
+    """Starts a background thread that asks the OS to read the stored Graph data of an account into the page cache, so
+    disk reads overlap with the rest of the startup work. Only the files that will be loaded are hinted: the cached
+    pickle if it is fresh, the JSON documents otherwise. Does nothing on platforms without posix_fadvise.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+
+    rootpath = os.path.join(get_storage_root(), account)
+
+    def _advise_willneed():
+        # the freshness check stats every file, so it runs in the background thread as well
+        try:
+            cache_path = get_graph_cache_path(rootpath)
+        except (OSError, ValueError):  # no usable cache directory, so the JSON documents get read
+            cache_path = None
+        if cache_path is not None and is_graph_cache_fresh(rootpath, cache_path):
+            filepaths = [cache_path]  # only the pickle gets read
+        else:
+            filepaths = _get_graph_json_paths(rootpath)
+
+        for filepath in filepaths:
+            try:
+                fd = os.open(filepath, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    threading.Thread(target=_advise_willneed, daemon=True).start()
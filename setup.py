@@ -39,6 +39,9 @@ setup(
     package_data={},
     python_requires='>=3.5, <4',  # assume Python 4 will break
     install_requires=['botocore', 'packaging', 'python-dateutil', 'pydot'],
+    extras_require={
+        'fastjson': ['orjson']
+    },
     entry_points={
         'console_scripts': [
             'pmapper = principalmapper.__main__:main'
@@ -0,0 +1,47 @@
+"""Code for testing the command-line interface of Principal Mapper"""
+
+#  Copyright (c) NCC Group and Erik Steringer 2019. This file is part of Principal Mapper.
+#
+#      Principal Mapper is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU Affero General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      Principal Mapper is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU Affero General Public License for more details.
+#
+#      You should have received a copy of the GNU Affero General Public License
+#      along with Principal Mapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import contextlib
+import io
+import os
+import unittest
+import unittest.mock
+
+from principalmapper.__main__ import _MAIN_HELP_COLUMNS, _build_argument_parser, _print_main_help, _sniff_subcommand
+
+
+class CommandLineTest(unittest.TestCase):
+    def test_sniff_subcommand(self):
+        self.assertEqual(_sniff_subcommand(['query', 'x']), 'query')
+        self.assertEqual(_sniff_subcommand(['--debug', 'graph', '--list']), 'graph')
+        self.assertEqual(_sniff_subcommand(['--profile', 'query', 'query', 'x']), 'query')
+        self.assertEqual(_sniff_subcommand(['--profile', 'repl', 'query', 'x']), 'query')
+        self.assertEqual(_sniff_subcommand(['--account=1', 'query', 'x']), 'query')
+        self.assertEqual(_sniff_subcommand(['--acc', '1', 'repl']), 'repl')
+        self.assertEqual(_sniff_subcommand(['--', 'query', 'x']), 'query')
+        self.assertIsNone(_sniff_subcommand(['--', '--debug', 'query']))
+        self.assertIsNone(_sniff_subcommand(['bogus', 'query', 'x']))
+        self.assertIsNone(_sniff_subcommand(['--debug']))
+        self.assertIsNone(_sniff_subcommand([]))
+
+    def test_main_help_matches_argparse(self):
+        with unittest.mock.patch.dict(os.environ, {'COLUMNS': str(_MAIN_HELP_COLUMNS)}):
+            expected = _build_argument_parser(None, True).format_help()
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                _print_main_help()
+        self.assertEqual(output.getvalue(), expected)
@@ -17,6 +17,24 @@
 
 import unittest
 
+from tests.build_test_graphs import *
+from tests.build_test_graphs import _build_user_with_policy
+
 
 class GraphCheckingTest(unittest.TestCase):
-    pass
+    def test_get_node_by_searchable_name(self):
+        graph = build_graph_with_one_admin()
+        self.assertEqual(graph.get_node_by_searchable_name('user/admin').arn, 'arn:aws:iam::000000000000:user/admin')
+        self.assertIsNone(graph.get_node_by_searchable_name('user/other'))
+        graph.nodes.append(_build_user_with_policy({'Version': '2012-10-17', 'Statement': []}, 'OtherPolicy', 'other'))
+        self.assertIsNotNone(graph.get_node_by_searchable_name('user/other'))
+        graph.nodes = []
+        self.assertIsNone(graph.get_node_by_searchable_name('user/admin'))
+
+    def test_get_node_by_searchable_name_after_replacement(self):
+        graph = build_graph_with_one_admin()
+        self.assertIsNotNone(graph.get_node_by_searchable_name('user/admin'))
+        other = _build_user_with_policy({'Version': '2012-10-17', 'Statement': []}, 'OtherPolicy', 'other')
+        graph.nodes[0] = other
+        self.assertIsNone(graph.get_node_by_searchable_name('user/admin'))
+        self.assertIs(graph.get_node_by_searchable_name('user/other'), other)
@@ -0,0 +1,90 @@
+"""Code for testing the storage and retrieval of Graph data on-disk"""
+
+
+#  Copyright (c) NCC Group and Erik Steringer 2019. This file is part of Principal Mapper.
+#
+#      Principal Mapper is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU Affero General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      Principal Mapper is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU Affero General Public License for more details.
+#
+#      You should have received a copy of the GNU Affero General Public License
+#      along with Principal Mapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import os.path
+import pickle
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from tests.build_test_graphs import *
+from principalmapper.graphing.graph_actions import get_graph_from_disk
+from principalmapper.util.storage import get_graph_cache_header, get_graph_cache_path
+
+
+class GraphStorageTest(unittest.TestCase):
+    def setUp(self):
+        # keep cached Graphs out of the cache directory of whoever runs the tests
+        self.cachedir = tempfile.TemporaryDirectory()
+        patcher = unittest.mock.patch('principalmapper.util.storage.get_cache_root', return_value=self.cachedir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.cachedir.cleanup)
+
+    def test_cached_graph_matches_json(self):
+        graph = build_playground_graph()
+        with tempfile.TemporaryDirectory() as tempdir:
+            graph.store_graph_as_json(tempdir)
+            from_json = get_graph_from_disk(tempdir)
+            self.assertFalse(os.path.exists(os.path.join(tempdir, 'graph.pkl')))
+            self.assertTrue(os.path.exists(get_graph_cache_path(tempdir)))
+            from_cache = get_graph_from_disk(tempdir)
+            self.assertEqual([x.arn for x in from_json.nodes], [x.arn for x in from_cache.nodes])
+            self.assertEqual([(x.source.arn, x.destination.arn) for x in from_json.edges],
+                             [(x.source.arn, x.destination.arn) for x in from_cache.edges])
+            self.assertEqual(from_json.metadata, from_cache.metadata)
+
+    def test_cached_graph_invalidated_by_json(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            build_graph_with_one_admin().store_graph_as_json(tempdir)
+            self.assertEqual(len(get_graph_from_disk(tempdir).nodes), 1)
+            build_empty_graph().store_graph_as_json(tempdir)
+            self.assertEqual(len(get_graph_from_disk(tempdir).nodes), 0)
+
+    def test_cached_graph_invalidated_by_restored_json(self):
+        with tempfile.TemporaryDirectory() as exportdir, tempfile.TemporaryDirectory() as parentdir:
+            # an older export, restored with its mtimes preserved after the live data was cached
+            build_empty_graph().store_graph_as_json(exportdir)
+            old_mtime_ns = os.stat(os.path.join(exportdir, 'metadata.json')).st_mtime_ns - 10 ** 10
+            for dirpath, _, filenames in os.walk(exportdir):
+                for filename in filenames:
+                    os.utime(os.path.join(dirpath, filename), ns=(old_mtime_ns, old_mtime_ns))
+            livedir = os.path.join(parentdir, 'live')
+            build_graph_with_one_admin().store_graph_as_json(livedir)
+            self.assertEqual(len(get_graph_from_disk(livedir).nodes), 1)
+            shutil.rmtree(livedir)
+            shutil.copytree(exportdir, livedir)
+            self.assertEqual(len(get_graph_from_disk(livedir).nodes), 0)
+
+    def test_cached_graph_of_other_format_ignored(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            build_graph_with_one_admin().store_graph_as_json(tempdir)
+            with open(get_graph_cache_path(tempdir), 'wb') as f:
+                pickle.dump((0,) + get_graph_cache_header(tempdir)[1:], f)
+                pickle.dump(build_empty_graph(), f)
+            self.assertEqual(len(get_graph_from_disk(tempdir).nodes), 1)
+
+    def test_unusable_cache_directory_ignored(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            build_graph_with_one_admin().store_graph_as_json(tempdir)
+            with unittest.mock.patch('principalmapper.util.storage.get_cache_root', side_effect=OSError):
+                self.assertEqual(len(get_graph_from_disk(tempdir).nodes), 1)
+            with unittest.mock.patch('principalmapper.util.storage.get_cache_root', side_effect=ValueError):
+                self.assertEqual(len(get_graph_from_disk(tempdir).nodes), 1)